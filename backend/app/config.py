@@ -8,7 +8,17 @@ from typing import Optional
 from dotenv import load_dotenv
 
 env_path = Path(__file__).parent.parent.parent / ".env"
-load_dotenv(dotenv_path=env_path)
+if not os.environ.get("COREP_ENV_LOADED"):
+    load_dotenv(dotenv_path=env_path)
+    os.environ["COREP_ENV_LOADED"] = "1"
+
+_ENV_KEYS = (
+    "OPENAI_API_KEY",
+    "GROQ_API_KEY",
+    "OPENAI_MODEL",
+    "GROQ_MODEL",
+    "SEED_INDEX_INT8",
+)
 
 
 class Settings:
@@ -17,25 +27,27 @@ class Settings:
     groq_api_key: Optional[str]
     openai_model: str
     groq_model: str
-    chroma_persist_directory: str
+    seed_index_int8: bool
 
     def __init__(self):
-        self.openai_api_key = os.getenv("OPENAI_API_KEY", "").strip() or None
-        self.groq_api_key = os.getenv("GROQ_API_KEY", "").strip() or None
+        env = {key: os.environ.get(key, "").strip() for key in _ENV_KEYS}
+
+        self.openai_api_key = env["OPENAI_API_KEY"] or None
+        self.groq_api_key = env["GROQ_API_KEY"] or None
 
         if self.groq_api_key:
             self.llm_provider = "groq"
-            self.groq_model = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+            self.groq_model = env["GROQ_MODEL"] or "llama-3.3-70b-versatile"
         elif self.openai_api_key:
             self.llm_provider = "openai"
-            self.openai_model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+            self.openai_model = env["OPENAI_MODEL"] or "gpt-4o-mini"
         else:
             raise RuntimeError(
                 "Neither OPENAI_API_KEY nor GROQ_API_KEY is set. "
                 "Please set one of them in your .env file or environment variables."
             )
 
-        self.chroma_persist_directory = os.getenv("CHROMA_PERSIST_DIRECTORY", ".chroma")
+        self.seed_index_int8 = env["SEED_INDEX_INT8"].lower() in ("1", "true", "yes")
 
 
 @lru_cache(maxsize=1)
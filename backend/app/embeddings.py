@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer
+
+ONNX_CACHE_DIR = Path(__file__).parent.parent.parent / ".onnx"
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+TOKENIZER_CONFIG_FILE = "tokenizer_config.json"
+ONNX_PROVIDER = "CPUExecutionProvider"
+
+
+def _is_exported(model_dir: Path):
+    return (model_dir / QUANTIZED_MODEL_FILE).exists() and (
+        model_dir / TOKENIZER_CONFIG_FILE
+    ).exists()
+
+
+def _export_quantized_model(model_name: str, output_dir: Path):
+    output_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging_dir = Path(tempfile.mkdtemp(prefix=f"{output_dir.name}-", dir=output_dir.parent))
+    try:
+        model = ORTModelForFeatureExtraction.from_pretrained(
+            model_name, export=True, provider=ONNX_PROVIDER
+        )
+        quantizer = ORTQuantizer.from_pretrained(model)
+        quantization_config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=staging_dir, quantization_config=quantization_config)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(staging_dir)
+
+        if output_dir.exists() and not _is_exported(output_dir):
+            shutil.rmtree(output_dir, ignore_errors=True)
+        try:
+            staging_dir.rename(output_dir)
+        except OSError:
+            # Another worker finished its export first; keep theirs.
+            if not _is_exported(output_dir):
+                raise
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+class OnnxEmbeddings(Embeddings):
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: Path = ONNX_CACHE_DIR,
+        batch_size: int = 32,
+        max_length: int = 256,
+    ):
+        model_dir = cache_dir / model_name.replace("/", "--")
+        if not _is_exported(model_dir):
+            _export_quantized_model(model_name, model_dir)
+
+        self.model_name = f"{model_name} (onnx-int8)"
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self._model = ORTModelForFeatureExtraction.from_pretrained(
+            model_dir, file_name=QUANTIZED_MODEL_FILE, provider=ONNX_PROVIDER
+        )
+
+    def _embed(self, texts: List[str]):
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            encoded = self._tokenizer(
+                texts[start : start + self.batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            token_embeddings = self._model(**encoded).last_hidden_state
+
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            vectors.extend(pooled.tolist())
+        return vectors
+
+    def embed_documents(self, texts: List[str]):
+        return self._embed(list(texts))
+
+    def embed_query(self, text: str):
+        return self._embed([text])[0]
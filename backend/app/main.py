@@ -4,16 +4,22 @@ import logging
 import traceback
 from typing import Any
 
+import orjson
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 from .config import get_settings
 from .models import AnalyzeResponse, ScenarioRequest
-from .rag import generate_corep_assessment
+from .rag import generate_corep_assessment, stream_corep_assessment, warm_up
 
 logger = logging.getLogger(__name__)
 
 
+def _sse_event(event: str, data: str):
+    return f"event: {event}\ndata: {data}\n\n"
+
+
 def create_app():
     app = FastAPI(
         title="PRA COREP Own Funds LLM Assistant",
@@ -32,6 +38,13 @@ def create_app():
         allow_headers=["*"],
     )
 
+    @app.on_event("startup")
+    def warm_rag_pipeline():
+        try:
+            warm_up()
+        except Exception as e:
+            logger.warning(f"RAG warm-up failed, deferring to first request: {e}")
+
     @app.get("/health", tags=["system"])
     def health():
         settings = get_settings()
@@ -46,9 +59,9 @@ def create_app():
         }
 
     @app.post("/api/analyze_scenario", response_model=AnalyzeResponse, tags=["corep"])
-    def analyze_scenario(payload: ScenarioRequest):
+    async def analyze_scenario(payload: ScenarioRequest):
         try:
-            corep_result, retrieved_docs, raw_model_output = generate_corep_assessment(
+            corep_result, retrieved_docs, raw_model_output = await generate_corep_assessment(
                 scenario=payload.scenario
             )
 
@@ -67,6 +80,32 @@ def create_app():
                 detail=f"Internal server error: {error_msg}. Check server logs for details."
             )
 
+    @app.post("/api/analyze_scenario/stream", tags=["corep"])
+    async def analyze_scenario_stream(payload: ScenarioRequest):
+        async def event_stream():
+            try:
+                async for event, data in stream_corep_assessment(scenario=payload.scenario):
+                    if event == "token":
+                        yield _sse_event("token", orjson.dumps(data).decode())
+                        continue
+
+                    corep_result, retrieved_docs, raw_model_output = data
+                    response = AnalyzeResponse(
+                        scenario=payload.scenario,
+                        retrieved_context=retrieved_docs,
+                        corep_result=corep_result,
+                        raw_model_output=raw_model_output,
+                    )
+                    yield _sse_event("result", response.model_dump_json())
+            except Exception as e:
+                error_msg = str(e)
+                error_trace = traceback.format_exc()
+                logger.error(f"Error in analyze_scenario_stream: {error_msg}\n{error_trace}")
+                detail = f"Internal server error: {error_msg}. Check server logs for details."
+                yield _sse_event("error", orjson.dumps({"detail": detail}).decode())
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
     return app
 
 
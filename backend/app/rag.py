@@ -1,16 +1,23 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
 from textwrap import dedent
+from threading import Lock
 from typing import Any, Dict, List, Tuple
 
-from langchain_community.vectorstores import Chroma
+import numpy as np
+import orjson
 from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
 from .config import get_settings
-from .models import CorepResult, RetrievedDoc
+from .models import CorepResult
 from .validation import validate_corep_result
 
 try:
@@ -23,6 +30,18 @@ try:
 except ImportError:
     HuggingFaceEmbeddings = None
 
+try:
+    from .embeddings import OnnxEmbeddings
+except ImportError:
+    OnnxEmbeddings = None
+
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+SEED_EMBEDDINGS_PATH = Path(__file__).parent / "seed_embeddings.npz"
+RESPONSE_CACHE_SIZE = 256
+
 
 def _build_seed_corpus():
     docs = []
@@ -103,42 +122,180 @@ def _build_seed_corpus():
     return docs
 
 
-def _get_vector_store():
-    settings = get_settings()
-    
+@lru_cache(maxsize=1)
+def _get_embeddings():
+    if OnnxEmbeddings is not None:
+        try:
+            return OnnxEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+        except Exception as e:
+            logger.warning(f"ONNX embeddings unavailable, falling back to PyTorch model: {e}")
     if HuggingFaceEmbeddings is not None:
-        embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2",
+        return HuggingFaceEmbeddings(
+            model_name=EMBEDDING_MODEL_NAME,
             model_kwargs={"device": "cpu"},
             encode_kwargs={"normalize_embeddings": True},
         )
-    elif settings.openai_api_key:
-        embeddings = OpenAIEmbeddings(api_key=settings.openai_api_key)
-    else:
-        raise RuntimeError(
-            "No embedding model available. Please install sentence-transformers: "
-            "pip install sentence-transformers langchain-huggingface"
-        )
 
-    vector_store = Chroma(
-        collection_name="corep_own_funds_rules",
-        embedding_function=embeddings,
-        persist_directory=settings.chroma_persist_directory,
+    settings = get_settings()
+    if settings.openai_api_key:
+        return OpenAIEmbeddings(api_key=settings.openai_api_key)
+    raise RuntimeError(
+        "No embedding model available. Please install sentence-transformers: "
+        "pip install sentence-transformers langchain-huggingface"
     )
 
+
+def _quantize_int8(vectors: np.ndarray):
+    max_abs = float(np.max(np.abs(vectors))) if vectors.size else 0.0
+    scale = max_abs / 127.0 if max_abs > 0 else 1.0
+    quantized = np.clip(np.round(vectors / scale), -127, 127).astype(np.int8)
+    return quantized, scale
+
+
+class _SeedIndex:
+
+    def __init__(self, embeddings, quantize: bool = False):
+        self._embeddings = embeddings
+        self.quantize = quantize
+        self.vectors = None
+        self.quantized = None
+        self.scale = 1.0
+        self.docs = []
+
+    def add_documents(self, docs: List[Document]):
+        vectors = self._embeddings.embed_documents([doc.page_content for doc in docs])
+        self.add_embeddings(docs, vectors)
+
+    def add_embeddings(self, docs: List[Document], vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms > 0, norms, 1.0)
+
+        if self.vectors is None:
+            self.vectors = np.ascontiguousarray(vectors)
+        else:
+            self.vectors = np.ascontiguousarray(np.vstack([self.vectors, vectors]))
+        self.docs.extend(docs)
+
+        if self.quantize:
+            self.quantized, self.scale = _quantize_int8(self.vectors)
+
+    def search(self, query: np.ndarray, k: int):
+        if not self.docs:
+            return np.empty(0, dtype=np.intp)
+
+        if self.quantize:
+            query_q8, query_scale = _quantize_int8(query)
+            scores = (self.quantized.astype(np.int32) @ query_q8.astype(np.int32)) * (
+                self.scale * query_scale
+            )
+        else:
+            scores = self.vectors @ query
+
+        k = min(k, len(self.docs))
+        if k < len(self.docs):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(self.docs))
+        return top[np.argsort(-scores[top])]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4):
+        return [self.docs[idx] for idx in self.search(_normalize(embedding), k)]
+
+
+def _embedding_model_name(embeddings):
+    return str(getattr(embeddings, "model_name", None) or getattr(embeddings, "model", ""))
+
+
+def _corpus_fingerprint(docs: List[Document]):
+    joined = "\x00".join(doc.page_content for doc in docs)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+
+def build_seed_embeddings(path: Path = SEED_EMBEDDINGS_PATH):
+    embeddings = _get_embeddings()
+    docs = _build_seed_corpus()
+    vectors = embeddings.embed_documents([doc.page_content for doc in docs])
+
+    np.savez(
+        path,
+        vectors=np.asarray(vectors, dtype=np.float32),
+        model=_embedding_model_name(embeddings),
+        fingerprint=_corpus_fingerprint(docs),
+    )
+
+
+def _load_seed_embeddings(embeddings, docs: List[Document]):
+    if not SEED_EMBEDDINGS_PATH.exists():
+        return None
+
     try:
-        count = vector_store._collection.count()
-    except:
-        count = 0
+        with np.load(SEED_EMBEDDINGS_PATH) as data:
+            if str(data["model"]) != _embedding_model_name(embeddings):
+                return None
+            if str(data["fingerprint"]) != _corpus_fingerprint(docs):
+                return None
+            vectors = data["vectors"]
+    except (OSError, KeyError, ValueError):
+        return None
+
+    if vectors.shape[0] != len(docs):
+        return None
+    return vectors
+
 
-    if count == 0:
-        docs = _build_seed_corpus()
+@lru_cache(maxsize=1)
+def _get_vector_store():
+    embeddings = _get_embeddings()
+    vector_store = _SeedIndex(embeddings, quantize=get_settings().seed_index_int8)
+
+    docs = _build_seed_corpus()
+    vectors = _load_seed_embeddings(embeddings, docs)
+    if vectors is not None:
+        vector_store.add_embeddings(docs, vectors)
+    else:
         vector_store.add_documents(docs)
-        vector_store.persist()
 
     return vector_store
 
 
+class _ResponseCache:
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Tuple[str, int]):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Tuple[str, int], value: Tuple[Any, ...]):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+
+_response_cache = _ResponseCache(RESPONSE_CACHE_SIZE)
+
+
+def _response_cache_key(scenario: str, top_k: int):
+    normalized = " ".join(scenario.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest(), top_k
+
+
+def _normalize(vector: List[float]):
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm > 0 else array
+
+
+@lru_cache(maxsize=1)
 def _build_prompt():
     system_prompt = dedent(
         """
@@ -201,58 +358,102 @@ def _build_prompt():
     ])
 
 
-def _call_llm(scenario: str, context_text: str):
-    settings = get_settings()
-
-    if settings.llm_provider == "groq":
+@lru_cache(maxsize=4)
+def _build_llm(provider: str, model: str, api_key: str):
+    if provider == "groq":
         if ChatGroq is None:
             raise RuntimeError(
                 "langchain-groq is not installed. Please install it with: "
                 "pip install langchain-groq"
             )
+        return ChatGroq(model=model, api_key=api_key, temperature=0.0)
+    return ChatOpenAI(model=model, api_key=api_key, temperature=0.0)
+
+
+def _get_llm():
+    settings = get_settings()
+
+    if settings.llm_provider == "groq":
         if not settings.groq_api_key:
             raise RuntimeError("GROQ_API_KEY is not set.")
-        llm = ChatGroq(
-            model=settings.groq_model,
-            api_key=settings.groq_api_key,
-            temperature=0.0,
-        )
-    else:
-        if not settings.openai_api_key:
-            raise RuntimeError("OPENAI_API_KEY is not set.")
-        llm = ChatOpenAI(
-            model=settings.openai_model,
-            api_key=settings.openai_api_key,
-            temperature=0.0,
-        )
+        return _build_llm("groq", settings.groq_model, settings.groq_api_key)
+
+    if not settings.openai_api_key:
+        raise RuntimeError("OPENAI_API_KEY is not set.")
+    return _build_llm("openai", settings.openai_model, settings.openai_api_key)
+
+
+def warm_up():
+    _get_embeddings()
+    _get_vector_store()
+    _get_llm()
+
+
+def _extract_json_object(text: str):
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for idx in range(start, len(text)):
+        char = text[idx]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : idx + 1]
+    return None
+
+
+def _parse_json(text: str):
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        snippet = _extract_json_object(text)
+        if snippet is None:
+            raise
+        return orjson.loads(snippet)
 
-    prompt = _build_prompt()
-    chain = prompt | llm
 
-    response = chain.invoke({"scenario": scenario, "context": context_text})
-    content = response.content
+def _build_chain():
+    return _build_prompt() | _get_llm()
 
-    def _parse_json(text):
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            start = text.find("{")
-            end = text.rfind("}")
-            if start != -1 and end != -1 and end > start:
-                snippet = text[start : end + 1]
-                return json.loads(snippet)
-            raise
 
-    return _parse_json(content)
+async def _call_llm(scenario: str, context_text: str):
+    response = await _build_chain().ainvoke({"scenario": scenario, "context": context_text})
+    return _parse_json(response.content)
+
 
+def _embed_query(scenario: str):
+    return _get_embeddings().embed_query(scenario)
 
-def generate_corep_assessment(scenario: str, top_k: int = 4):
-    vector_store = _get_vector_store()
-    retriever = vector_store.as_retriever(search_kwargs={"k": top_k})
-    retrieved = retriever.invoke(scenario)
 
+def _retrieve(query_embedding: List[float], top_k: int):
+    return _get_vector_store().similarity_search_by_vector(query_embedding, k=top_k)
+
+
+@lru_cache(maxsize=256)
+def _format_context(entries: Tuple[Tuple[str, str, str], ...]):
+    return "\n\n---\n\n".join(
+        f"[{citation}] ({source})\n{text}" for source, citation, text in entries
+    )
+
+
+def _build_context(retrieved: List[Document]):
     retrieved_docs = []
-    context_chunks = []
+    context_entries = []
 
     for idx, doc in enumerate(retrieved):
         metadata = doc.metadata or {}
@@ -261,24 +462,66 @@ def generate_corep_assessment(scenario: str, top_k: int = 4):
         text = str(doc.page_content)
 
         retrieved_docs.append(
-            RetrievedDoc(
-                id=str(idx),
-                source=source,
-                citation=citation,
-                text=text,
-            )
+            {"id": str(idx), "source": source, "citation": citation, "text": text}
         )
 
-        context_chunks.append(f"[{citation}] ({source})\n{text}")
+        context_entries.append((source, citation, text))
 
-    context_text = "\n\n---\n\n".join(context_chunks)
+    return retrieved_docs, _format_context(tuple(context_entries))
 
-    raw_model_output = _call_llm(scenario=scenario, context_text=context_text)
+
+def _finalize_assessment(
+    cache_key: Tuple[str, int],
+    retrieved_docs: List[Dict[str, str]],
+    raw_model_output: Dict[str, Any],
+):
     corep_result = validate_corep_result(raw_model_output)
 
-    citations_from_docs = {doc.citation for doc in retrieved_docs}
-    for citation in sorted(citations_from_docs):
-        if citation not in corep_result.rules_used:
-            corep_result.rules_used.append(citation)
+    seen_rules = set(corep_result.rules_used)
+    citations_from_docs = {doc["citation"] for doc in retrieved_docs}
+    for citation in sorted(citations_from_docs - seen_rules):
+        corep_result.rules_used.append(citation)
+
+    result = (corep_result, retrieved_docs, raw_model_output)
+    _response_cache.put(cache_key, result)
+    return result
+
+
+async def generate_corep_assessment(scenario: str, top_k: int = 4):
+    cache_key = _response_cache_key(scenario, top_k)
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    query_embedding = await asyncio.to_thread(_embed_query, scenario)
+    retrieved = await asyncio.to_thread(_retrieve, query_embedding, top_k)
+    retrieved_docs, context_text = _build_context(retrieved)
+
+    raw_model_output = await _call_llm(scenario=scenario, context_text=context_text)
+    return _finalize_assessment(cache_key, retrieved_docs, raw_model_output)
+
+
+async def stream_corep_assessment(scenario: str, top_k: int = 4):
+    cache_key = _response_cache_key(scenario, top_k)
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        yield "result", cached
+        return
+
+    query_embedding = await asyncio.to_thread(_embed_query, scenario)
+    retrieved = await asyncio.to_thread(_retrieve, query_embedding, top_k)
+    retrieved_docs, context_text = _build_context(retrieved)
+
+    content_chunks = []
+    async for chunk in _build_chain().astream({"scenario": scenario, "context": context_text}):
+        if chunk.content:
+            content_chunks.append(chunk.content)
+            yield "token", chunk.content
+
+    raw_model_output = _parse_json("".join(content_chunks))
+    yield "result", _finalize_assessment(cache_key, retrieved_docs, raw_model_output)
+
 
-    return corep_result, retrieved_docs, raw_model_output
+if __name__ == "__main__":
+    build_seed_embeddings()
+    print(f"Wrote seed embeddings to {SEED_EMBEDDINGS_PATH}")
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 from typing import Any, Dict, List, Optional
 
 from .models import CorepResult
@@ -8,6 +9,10 @@ from .models import CorepResult
 NUMERIC_FIELDS = ["CET1", "AT1", "Tier2", "RWA", "CET1_ratio"]
 MIN_CET1_RATIO = 0.045
 
+_NUMERIC_RE = re.compile(
+    r"^\s*([+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)\s*%?\s*$"
+)
+
 
 def _to_optional_float(value: Any):
     if value is None:
@@ -15,13 +20,8 @@ def _to_optional_float(value: Any):
     if isinstance(value, (int, float)):
         return float(value)
     if isinstance(value, str):
-        stripped = value.strip().replace("%", "")
-        if not stripped:
-            return None
-        try:
-            return float(stripped)
-        except ValueError:
-            return None
+        match = _NUMERIC_RE.match(value)
+        return float(match.group(1)) if match else None
     return None
 
 
@@ -81,19 +81,23 @@ def validate_corep_result(initial: Dict[str, Any]):
 
     model_missing = initial.get("missing_fields") or []
     if isinstance(model_missing, list):
+        seen_missing = set(missing_fields)
         for entry in model_missing:
             entry_str = str(entry)
-            if entry_str not in missing_fields:
+            if entry_str not in seen_missing:
+                seen_missing.add(entry_str)
                 missing_fields.append(entry_str)
 
     model_warnings = initial.get("validation_warnings") or []
     if isinstance(model_warnings, list):
+        seen_warnings = set(validation_warnings)
         for warning in model_warnings:
             warning_str = str(warning)
-            if warning_str not in validation_warnings:
+            if warning_str not in seen_warnings:
+                seen_warnings.add(warning_str)
                 validation_warnings.append(warning_str)
 
-    result = CorepResult(
+    result = CorepResult.model_construct(
         template_name=template_name,
         CET1=cet1,
         AT1=at1,
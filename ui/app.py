@@ -6,17 +6,54 @@ from typing import Any, Dict, List, Optional
 
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 def get_backend_base_url():
     return os.getenv("COREP_BACKEND_HOST", "http://localhost:8000").rstrip("/")
 
 
+@st.cache_resource
+def get_http_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, connect=3, read=0, backoff_factor=0.3),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _iter_sse_events(response: requests.Response):
+    event = "message"
+    data_lines = []
+    # Split on "\n" only: JSON payloads may contain U+2028/U+2029/U+0085,
+    # which str.splitlines() would treat as line breaks.
+    for line in response.iter_lines(delimiter="\n", decode_unicode=True):
+        line = line.rstrip("\r")
+        if not line:
+            if data_lines:
+                yield event, "\n".join(data_lines)
+            event = "message"
+            data_lines = []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
+    if data_lines:
+        yield event, "\n".join(data_lines)
+
+
 def call_backend(scenario: str):
     base_url = get_backend_base_url()
-    url = f"{base_url}/api/analyze_scenario"
+    url = f"{base_url}/api/analyze_scenario/stream"
     try:
-        response = requests.post(url, json={"scenario": scenario}, timeout=60)
+        response = get_http_session().post(
+            url, json={"scenario": scenario}, timeout=60, stream=True
+        )
     except Exception as exc:
         st.error(f"Error contacting backend at {url}: {exc}")
         return None
@@ -25,11 +62,32 @@ def call_backend(scenario: str):
         st.error(f"Backend returned HTTP {response.status_code}: {response.text}")
         return None
 
-    try:
-        return response.json()
-    except Exception as exc:
-        st.error(f"Failed to parse backend response as JSON: {exc}")
-        return None
+    status = st.empty()
+    placeholder = st.empty()
+    streamed_text = ""
+
+    with response:
+        try:
+            for event, data in _iter_sse_events(response):
+                if event == "token":
+                    if not streamed_text:
+                        status.caption("Streaming LLM output...")
+                    streamed_text += json.loads(data)
+                    placeholder.markdown(f"```json\n{streamed_text}\n```")
+                elif event == "result":
+                    return json.loads(data)
+                elif event == "error":
+                    st.error(f"Backend error: {json.loads(data).get('detail', data)}")
+                    return None
+        except Exception as exc:
+            st.error(f"Failed to read streamed backend response: {exc}")
+            return None
+        finally:
+            status.empty()
+            placeholder.empty()
+
+    st.error("Backend stream ended without a result.")
+    return None
 
 
 def render_corep_table(corep_result: Dict[str, Any]):